@@ -4,7 +4,7 @@ Force generate cache for all game contexts
 import time
 import wordle_solver
 import wordle_contexts
-from wordle_utils import duration_fmt
+from wordle_utils import duration_fmt, available_cpu_count
 
 def main():
     # Go through all game contexts
@@ -97,13 +97,12 @@ def main():
             else:
                 print(f"Cache for {guess!r}: {len(cache_results)} results")
 
-import os
 import concurrent.futures
 
 def main_mp(mp = True):
     # Go through all game contexts
     if mp is True:
-        mp = os.cpu_count()
+        mp = available_cpu_count()
 
     max_unsaved_jobs = mp * 8
     for context in wordle_contexts.get_all_contexts():
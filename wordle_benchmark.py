@@ -7,12 +7,11 @@ import random
 import concurrent.futures
 from functools import partial
 from collections import Counter
-from multiprocessing import cpu_count
 
 import wordle_test
 import wordle_contexts
 
-from wordle_utils import progress_bar
+from wordle_utils import progress_bar, available_cpu_count
 
 def main():
     # Select Game Context
@@ -42,7 +41,7 @@ def benchmark(context, mp = True):
         turn_stats = Counter()
 
         if mp is True:
-            mp = cpu_count()
+            mp = available_cpu_count()
 
         start = time.perf_counter()
         if mp:
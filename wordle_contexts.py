@@ -2,7 +2,6 @@
 wordle_contexts.py
 """
 import os
-import hjson
 import filelock
 
 ALL_WORDS_TOKEN = "ALL_WORDS_ARE_VALID_GUESSES"
@@ -149,6 +148,7 @@ class Context:
         self.word_length = word_length
 
         self._word_list = None
+        self._word_set = None
         self._solutions = None
 
         # Track for loading and saving to cache
@@ -185,14 +185,14 @@ class Context:
             solutions = load_words(solutions_file)
 
             # Verify results are valid
-            self._check_word_list_solutions(word_list, solutions)
+            word_set, _ = self._check_word_list_solutions(word_list, solutions)
         else:
             # Get results from internet
             print("Getting solutions and word list from internet.")
             word_list, solutions = WORDLE_CONTEXTS_SCRAPER[self.context_id]()
 
             # Verify words are valid
-            self._check_word_list_solutions(word_list, solutions)
+            word_set, _ = self._check_word_list_solutions(word_list, solutions)
 
             if word_list != [ALL_WORDS_TOKEN]:
                 word_list.sort()
@@ -210,6 +210,9 @@ class Context:
             word_list = [word for word in word_list if len(word) == self.word_length]
         self._word_list = word_list
 
+        # Keep the set built during validation for fast membership tests
+        self._word_set = word_set
+
         solutions = [word for word in solutions if len(word) == self.word_length]
         self._solutions = solutions
 
@@ -223,13 +226,14 @@ class Context:
     def _check_word_list_solutions(self, word_list, solutions):
         # Verify solution and word lists make sense
         # Make into sets and check lengths
+        # The sets are returned, so callers do not need to build them again
         word_list_count = len(word_list)
-        word_list = set(word_list)
+        word_list = frozenset(word_list)
         if len(word_list) != word_list_count:
             raise ValueError("Word list contains duplicate words")
 
         solutions_count = len(solutions)
-        solutions = set(solutions)
+        solutions = frozenset(solutions)
         if len(solutions) != solutions_count:
             raise ValueError("Solutions contain duplicate words")
 
@@ -243,6 +247,8 @@ class Context:
             if not word_list.issuperset(solutions):
                 raise ValueError("Not all solutions are in word list")
 
+        return word_list, solutions
+
     def _guesses_filename(self):
         naive_str = "naive" if self.naive else "smart"
         guesses_filename = WORDLE_GUESSES_FILE_FORMAT.format(
@@ -258,6 +264,9 @@ class Context:
             if os.path.exists(tmpfile):
                 raise FileExistsError("Temp file exists for cache. Something is wrong.")
 
+            # Only the guess cache needs hjson, so import it when used
+            import hjson
+
             # Try to load cache
             try:
                 with open(self._guesses_filename()) as f:
@@ -268,6 +277,8 @@ class Context:
     def _save_guess_data(self):
         # Dump first to a temp file, to avoid half writing the cache
         # Because it turns out safely writing file is hard
+        import hjson
+
         tmpfile = f"{self._guesses_filename()}.tmp"
         with open(tmpfile, "w") as f:
             hjson.dumpJSON(self._cache_data, f, indent = "\t")
@@ -385,4 +396,4 @@ class Context:
 
         if self._word_list == [ALL_WORDS_TOKEN]:
             return len(word) == self.word_length
-        return word in self._word_list
+        return len(word) == self.word_length and word in self._word_set
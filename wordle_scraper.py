@@ -8,7 +8,6 @@ Two Wordle Games are currently supported:
  - https://www.nytimes.com/games/wordle
 """
 import json
-import hjson
 import requests
 import urllib.parse
 
@@ -180,7 +179,27 @@ ABSURDLE_JS_CRIB = 'src="main.'
 ABSURDLE_SOLUTIONS_CRIB = 'N=R({CI:"GARVI'
 ABSURDLE_WORD_LIST_CRIB = 'I=R({AA:"HEDLI'
 
+def absurdle_decode(words_json):
+    """
+    Decode an Absurdle word table. Each key is a shared prefix, and each
+    value is the remaining letters of every word with that prefix packed
+    back to back.
+    """
+    words = []
+    for prefix, remaining in words_json.items():
+        # Every suffix has the same length, so slice at a fixed stride
+        # Lower case once for the whole group, instead of for every word
+        prefix = prefix.lower()
+        remaining = remaining.lower()
+        step = 5 - len(prefix)
+        words.extend([prefix + remaining[i:i + step]
+            for i in range(0, len(remaining), step)])
+    return words
+
 def scrap_absurdle():
+    # Only Absurdle needs hjson, so avoid paying for the import otherwise
+    import hjson
+
     wordle_page = requests.get(ABSURDLE_URL).text
 
     # Extract javascript file
@@ -196,22 +215,14 @@ def scrap_absurdle():
     word_list_raw = get_bracketed_crib(wordle_js, ABSURDLE_WORD_LIST_CRIB, "{", "}")
     word_list_json = hjson.loads(word_list_raw)
 
-    word_list = []
-    for prefix, remaining in word_list_json.items():
-        for i in range(0, len(remaining), 5 - len(prefix)):
-            suffix = remaining[i:i + 5 - len(prefix)]
-            word_list.append((prefix + suffix).lower())
+    word_list = absurdle_decode(word_list_json)
 
     # Get solutions
     # Extract word list as json object
     solutions_raw = get_bracketed_crib(wordle_js, ABSURDLE_SOLUTIONS_CRIB, "{", "}")
     solutions_json = hjson.loads(solutions_raw)
 
-    solutions = []
-    for prefix, remaining in solutions_json.items():
-        for i in range(0, len(remaining), 5 - len(prefix)):
-            suffix = remaining[i:i + 5 - len(prefix)]
-            solutions.append((prefix + suffix).lower())
+    solutions = absurdle_decode(solutions_json)
 
     # Add solutions to word list
     word_list = word_list + solutions
@@ -1,13 +1,15 @@
+import math
 import time
 import itertools
+import functools
+from collections import Counter
 from abc import ABCMeta, abstractmethod
 
 import concurrent.futures
-from multiprocessing import cpu_count
 
 from wordle_utils import progress_bar, ProgressBarMP, \
     wait_exception_or_completed, chunked, filter_blacklist, \
-    sortdict
+    sortdict, available_cpu_count
 
 def wordle_result(guess, solution, context):
     """Given a guess and solution, generate the coloring wordle would show"""
@@ -32,20 +34,22 @@ def wordle_result(guess, solution, context):
             result[index] = "b"
 
     # Second Pass: Count Letters
-    solution_letters = {l: 0 for l in context.letters}
+    # Only letters left in the solution get a count
+    solution_letters = {}
     for index in range(context.word_length):
         if result[index] != "g":
-            solution_letters[solution[index]] += 1
+            letter = solution[index]
+            solution_letters[letter] = solution_letters.get(letter, 0) + 1
 
     # Third Pass: Mark Present
     for index in range(context.word_length):
         if result[index] == "u":
             # Evaluate if Present
-            assert guess[index] in solution
+            # The first pass already marked letters not in solution absent
 
             # If letters remaining, mark as present
             # Left to Right
-            if solution_letters[guess[index]]:
+            if solution_letters.get(guess[index]):
                 solution_letters[guess[index]] -= 1
                 result[index] = "y"
             else:
@@ -54,11 +58,51 @@ def wordle_result(guess, solution, context):
 
     return "".join(result)
 
+# Function to build distinct_result() for each word length
+_DISTINCT_RESULT_BUILDERS = {}
+
+def _distinct_result_builder(word_length):
+    """
+    Generate a function that takes the letters of a guess without repeated
+    letters, and returns a function giving the result of guess for a solution.
+    The result is written out for each position, so it is a single expression
+    instead of a loop.
+    """
+    if word_length not in _DISTINCT_RESULT_BUILDERS:
+        # Without repeated letters, no other guess letter can use up the
+        # matching letter in the solution, so any letter found is present
+        letters = ", ".join([f"l{index}" for index in range(word_length)])
+        result = " + ".join([
+            f'("g" if solution[{index}] == l{index} else "y" if l{index} in solution else "b")'
+            for index in range(word_length)])
+
+        namespace = {}
+        exec(f"def build({letters}):\n"
+             f"    def distinct_result(solution):\n"
+             f"        return {result}\n"
+             f"    return distinct_result\n", namespace)
+        _DISTINCT_RESULT_BUILDERS[word_length] = namespace["build"]
+
+    return _DISTINCT_RESULT_BUILDERS[word_length]
+
+def _guess_results(guess, context):
+    """
+    Return a function giving wordle_result() of guess for a solution.
+    Checks guess for repeated letters once, instead of for every solution.
+    """
+    if len(set(guess)) != len(guess):
+        return lambda solution: wordle_result(guess, solution, context)
+
+    return _distinct_result_builder(context.word_length)(*guess)
+
 class BaseWordGroup(metaclass = ABCMeta):
     """
     Base class to represent a group of words, and
     calculate statistics on them.
     """
+    # Subclasses use __slots__, so groups do not need an instance __dict__
+    __slots__ = ()
+
     @abstractmethod
     def __len__(self): pass
 
@@ -80,10 +124,101 @@ class BaseWordGroup(metaclass = ABCMeta):
     @abstractmethod
     def copy(self): pass
 
+def _bitmask(indexes, size):
+    """Create an integer with the bits at each of indexes set."""
+    # Set the bits in a byte buffer, then convert to an integer once
+    # Setting bits on an integer directly would copy it every time
+    bits = bytearray((size + 7) // 8)
+    for index in indexes:
+        bits[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(bits, "little")
+
+def _bit_indexes(mask):
+    """Generate the index of every set bit in mask, lowest first."""
+    # Reverse binary representation so character i is bit i
+    bits = bin(mask)[:1:-1]
+    index = bits.find("1")
+    while index != -1:
+        yield index
+        index = bits.find("1", index + 1)
+
+def _min_count_masks(position_masks, all_mask, word_length):
+    """
+    Calculate bitmasks of words with at least count matches, for each count.
+    position_masks has the bitmask of words that match at each position.
+    """
+    # Index 0 is every word, and an extra empty bucket is at the end
+    # So any count restriction is a single lookup
+    # Built one position at a time, a word has at least count matches if
+    # it already did, or if it had count - 1 and matches at this position
+    min_count = [0] * (word_length + 2)
+    min_count[0] = all_mask
+    for index in range(word_length):
+        position_mask = position_masks[index]
+        if not position_mask:
+            continue
+
+        for count in range(index + 1, 0, -1):
+            min_count[count] |= min_count[count - 1] & position_mask
+
+    return min_count
+
+# Stats are cached by word list, since every game loads the same word lists
+# Only a few are kept, as unpickled groups make new word lists
+@functools.lru_cache(maxsize = 8)
+def _word_list_stats(words, letters, word_length):
+    """Calculate the word breakdown and word contains bitmasks for words"""
+    # Word breakdown
+    # Line up the letters at each position in a string, last word first,
+    # so character i from the end is word i. Translating that to a binary
+    # string of where a letter is gives its bitmask, without a Python loop
+    # over every word
+    word_breakdown = []
+    for index in range(word_length):
+        column = "".join([word[index] for word in reversed(words)])
+        column_letters = set(column)
+        zeros = {ord(l): "0" for l in column_letters}
+
+        letter_masks = dict.fromkeys(letters, 0)
+        for letter in column_letters:
+            letter_masks[letter] = int(column.translate({**zeros, ord(letter): "1"}), 2)
+        word_breakdown.append(letter_masks)
+
+    # Word contains
+    word_contains = {l: 0 for l in letters}
+    for letter in letters:
+        for index in range(word_length):
+            word_contains[letter] |= word_breakdown[index][letter]
+
+    return word_breakdown, word_contains
+
+@functools.lru_cache(maxsize = 8)
+def _word_list_letter_min_count(words, letters, word_length):
+    """Calculate bitmasks of words with at least count of each letter"""
+    word_breakdown, _ = _word_list_stats(words, letters, word_length)
+
+    # Letter count
+    all_mask = (1 << len(words)) - 1
+    letter_min_count = {}
+    for letter in letters:
+        letter_min_count[letter] = _min_count_masks(
+            [letter_masks[letter] for letter_masks in word_breakdown],
+            all_mask, word_length)
+
+    return letter_min_count
+
 class WordGroup(BaseWordGroup):
     """
     Keep statistics on the words for refining solutions and guesses.
+
+    Each word is numbered by its position in a fixed, sorted word list.
+    The words in the group and the statistics are integer bitmasks of those
+    numbers, so refining the group is bitwise operations instead of set
+    operations on strings.
     """
+    __slots__ = ("_words", "_word_ids", "_mask", "_word_breakdown", "_word_contains",
+        "_letter_min_count", "_excluded_letters", "_filtered_masks", "context")
+
     def __init__(self, word_list, context = None):
         if context is None:
             # Only allow context to be None if word_list is a WordGroup
@@ -103,160 +238,156 @@ class WordGroup(BaseWordGroup):
             # and modifying using stats, so pre-compute stats
             word_list._prepare_stats()
 
-            assert not word_list._changed, \
-                f"{word_list.__class__.__name__} is changed after preparing stats"
-            self._changed = word_list._changed
-            self._word_list = word_list._word_list.copy()
+            # The word numbering and stats never change, so share them
+            self._words = word_list._words
+            self._word_ids = word_list._word_ids
+            self._mask = word_list._mask
 
-            # As stats are only ever used immutably, just add without copy
             self._word_breakdown = word_list._word_breakdown
             self._word_contains = word_list._word_contains
-            self._letter_count = word_list._letter_count
+            self._letter_min_count = word_list._letter_min_count
+            self._excluded_letters = word_list._excluded_letters
+            self._filtered_masks = word_list._filtered_masks
             self.context = word_list.context
 
         else:
-            # Save word list
-            self._word_list = set(word_list)
+            self._set_word_list(word_list, context)
+
+    def _set_word_list(self, word_list, context):
+        """Number the words and select all of them."""
+        self._words = tuple(sorted(set(word_list)))
+        self._word_ids = {word: i for i, word in enumerate(self._words)}
+        self._mask = (1 << len(self._words)) - 1
+
+        # Stats will be calculated if needed
+        self._word_breakdown = None
+        self._word_contains = None
+        self._letter_min_count = None
+        self.context = context
+
+        # Mask and excluded letters from the last excluded_letters check
+        self._excluded_letters = None
 
-            # Make changed so stats will be calculate if needed
-            self._changed = True
-            self.context = context
+        # Mask after filter_guesses() for each mask and excluded letters
+        # Shared by copies, since they use the same word numbering
+        self._filtered_masks = {}
 
     def __len__(self):
-        return len(self._word_list)
+        # Count bits with bin(), int.bit_count() needs Python 3.10
+        return bin(self._mask).count("1")
 
     def __contains__(self, val):
-        return val in self._word_list
+        word_id = self._word_ids.get(val)
+        return word_id is not None and bool(self._mask >> word_id & 1)
 
     def __bool__(self):
-        return bool(self._word_list)
+        return bool(self._mask)
 
     def __iter__(self):
-        return iter(self._word_list)
+        words = self._words
+        for word_id in _bit_indexes(self._mask):
+            yield words[word_id]
 
     def __getstate__(self):
         # For pickling
-        # Do not save stats, as they are useless if changed
-        # Even if not changed, it is still likely faster to recalculate
-        return {"_word_list": self._word_list, "_changed": True, "context": self.context}
+        # Only save the words still in the group, as the rest are useless
+        # Do not save stats, it is still likely faster to recalculate
+        return {"_word_list": list(self), "context": self.context}
+
+    def __setstate__(self, state):
+        self._set_word_list(state["_word_list"], state["context"])
 
     def copy(self):
         return self.__class__(self)
 
     def _prepare_stats(self):
-        """Calculate statistics for the current word list"""
-        if not self._changed:
-            # No need to recalculate statistics
+        """Calculate statistics for the numbered word list"""
+        if self._word_breakdown is not None:
+            # Stats cover every numbered word, so they never need
+            # to be recalculated
             return
 
-        # Word breakdown
-        self._word_breakdown = [
-            {l: set() for l in self.context.letters} for i in range(self.context.word_length)]
-
-        for word in self._word_list:
-            for index in range(self.context.word_length):
-                self._word_breakdown[index][word[index]].add(word)
-
-        # Make Word breakdown into frozensets
-        for index in range(self.context.word_length):
-            for letter in self.context.letters:
-                self._word_breakdown[index][letter] = frozenset(
-                    self._word_breakdown[index][letter])
-
-        # Word contains
-        self._word_contains = {l: set() for l in self.context.letters}
-        for letter in self.context.letters:
-            for index in range(self.context.word_length):
-                self._word_contains[letter].update(
-                    self._word_breakdown[index][letter])
-
-        # Make word contains frozensets
-        for letter in self.context.letters:
-            self._word_contains[letter] = frozenset(self._word_contains[letter])
-
-        # Letter count
-        # Create a bucket for each letter and count of that letter in word
-        # Note that some buckets will always be empty
-        self._letter_count = {
-            l: {c: set() for c in range(1, self.context.word_length + 1)} for l in self.context.letters}
-
-        for word in self._word_list:
-            for letter in set(word):
-                count = word.count(letter)
-                self._letter_count[letter][count].add(word)
-
-        # Make letter count frozensets
-        for letter in self.context.letters:
-            for count in range(1, self.context.word_length + 1):
-                self._letter_count[letter][count] = frozenset(
-                    self._letter_count[letter][count])
-
-        # Mark as not changed anymore
-        self._changed = False
+        self._word_breakdown, self._word_contains = _word_list_stats(
+            self._words, self.context.letters, self.context.word_length)
 
     @property
     def excluded_letters(self):
         """Check which letters never appear in the word group"""
+        # Reuse the last result if the words in the group have not changed
+        if self._excluded_letters is not None:
+            mask, excluded_letters = self._excluded_letters
+            if mask == self._mask:
+                return excluded_letters
+
         # Calculate excluded letters using breakdown
         self._prepare_stats()
-        excluded_letters = set()
-        for letter, word_set in self._word_contains.items():
-            if not len(word_set):
-                excluded_letters.add(letter)
+        excluded_letters = frozenset([letter
+            for letter, word_mask in self._word_contains.items()
+            if not word_mask & self._mask])
+
+        self._excluded_letters = self._mask, excluded_letters
         return excluded_letters
 
 class GuessGroup(WordGroup):
+    __slots__ = ()
+
     def filter_guesses(self, excluded_letters):
         """
         Filter out guesses that are not possible based on excluded letters.
         """
+        # Reuse the result if this group was already filtered the same way
+        filter_key = self._mask, frozenset(excluded_letters)
+        if filter_key in self._filtered_masks:
+            self._mask = self._filtered_masks[filter_key]
+            return
+
         self._prepare_stats()
 
-        # Get current word count
-        word_count = len(self)
+        # Words in the group before any are filtered out
+        word_mask = self._mask
 
-        # Create a set of all words that contain excluded letters, grouped by count
-        suspect_breakdown = {index: set() for index in range(1, self.context.word_length + 1)}
-        for letter in excluded_letters:
-            for word in self._word_contains[letter]:
-                count = 0
-                for index in range(self.context.word_length):
-                    if word[index] in excluded_letters:
-                        count += 1
+        # Words with an excluded letter at each position
+        excluded_masks = []
+        for letter_masks in self._word_breakdown:
+            excluded_mask = 0
+            for letter in excluded_letters:
+                excluded_mask |= letter_masks[letter]
+            excluded_masks.append(excluded_mask)
 
-                suspect_breakdown[count].add(word)
+        # Words with at least count excluded letters, for each count
+        suspect_min_count = _min_count_masks(
+            excluded_masks, word_mask, self.context.word_length)
 
         # Starting with the words with the most excluded letters
         # Since a word with only excluded letters will return result bbbbb
         # There is no information to be gained from it
-        self._word_list.difference_update(suspect_breakdown[self.context.word_length])
+        removed_mask = suspect_min_count[self.context.word_length]
+        removed_ids = []
 
         for count in range(self.context.word_length - 1, 0, -1):
-            for word in suspect_breakdown[count]:
-                # Check if a word exists that contains all of the non-excluded letters
-                superior_words = None
-                for index in range(self.context.word_length):
-                    if word[index] not in excluded_letters:
-                        word_set = self._word_breakdown[index][word[index]]
+            # Superior words can not have as many excluded letters
+            candidate_words = word_mask & ~suspect_min_count[count]
 
-                        if superior_words is None:
-                            superior_words = set(word_set)
-                        else:
-                            superior_words.intersection_update(word_set)
+            # Words with exactly count excluded letters
+            suspect_mask = suspect_min_count[count] & ~suspect_min_count[count + 1]
 
-                assert superior_words is not None, \
-                    f"All letters in word {word} are excluded, but count is {count}"
+            for word_id in _bit_indexes(suspect_mask):
+                # Check if a word exists that contains all of the non-excluded letters
+                # Pair each letter with the breakdown for its position
+                superior_words = candidate_words
+                for letter, letter_masks in zip(self._words[word_id], self._word_breakdown):
+                    if letter not in excluded_letters:
+                        superior_words &= letter_masks[letter]
 
-                # Remove superior words if they contain excluded letters
-                for other_count in range(count, self.context.word_length + 1):
-                    superior_words.difference_update(suspect_breakdown[other_count])
+                        if not superior_words:
+                            break
 
                 if superior_words:
                     # Remove word from list
-                    self._word_list.remove(word)
+                    removed_ids.append(word_id)
 
-        # Mark as change if guesses were eliminated
-        self._changed = word_count != len(self)
+        self._mask &= ~(removed_mask | _bitmask(removed_ids, len(self._words)))
+        self._filtered_masks[filter_key] = self._mask
 
 class AllWordsGuessGroup(BaseWordGroup):
     """
@@ -264,6 +395,8 @@ class AllWordsGuessGroup(BaseWordGroup):
     of letters as words. Generates the list on the fly
     to avoid needing to store all of it in memory.
     """
+    __slots__ = ("excluded_letters", "context")
+
     def __init__(self, context, excluded_letters = None):
         if excluded_letters is None:
             excluded_letters = set()
@@ -276,15 +409,17 @@ class AllWordsGuessGroup(BaseWordGroup):
 
     def __contains__(self, val):
         if isinstance(val, str) and len(val) == self.context.word_length:
-            return self.excluded_letters.disjoint(val)
+            # Words are every combination of the included letters
+            return self.excluded_letters.isdisjoint(val) and \
+                set(val).issubset(self.context.letters)
         return False
 
     def __iter__(self):
         """Iterate over all possible words"""
         # Use product() to create all words of possible letters
+        # Join with map(), so there is no Python loop per word
         included_letters = self.excluded_letters.symmetric_difference(self.context.letters)
-        for word in itertools.product(included_letters, repeat = self.context.word_length):
-            yield "".join(word)
+        yield from map("".join, itertools.product(included_letters, repeat = self.context.word_length))
 
     def copy(self):
         return self.__class__(self.context, self.excluded_letters)
@@ -297,15 +432,19 @@ class BaseSolutionGroup(WordGroup):
     """
     Keep statistics and manipulation for solutions.
     """
+    __slots__ = ()
+
     @abstractmethod
     def filter_solutions(self, word, result):
         """Filter solutions based on the result of the guess"""
         pass
 
     @abstractmethod
-    def guess_rank(self, guess):
+    def guess_rank(self, guess, rank_upper_bound = None):
         """
-        Calculate rank of a word in this group. Higher rank is better guess.
+        Calculate rank of a word in this group. Lower rank is better guess.
+        If rank_upper_bound is given, ranking may stop as soon as the rank
+        is known to be worse than it, returning only a lower bound.
         """
         pass
 
@@ -325,8 +464,11 @@ def is_result_possible(word, result, context):
 # Create list of possible results
 _RESULTS = {}
 
+# Possible results for each pattern of repeated letters
+_POSSIBLE_RESULTS = {}
+
 def possible_results(word, context):
-    """Return all possible results for word"""
+    """Return a tuple of all possible results for word"""
     if context.word_length not in _RESULTS:
         # Calculate results
         results = ["".join(result) for result in itertools.product("byg", repeat = context.word_length)]
@@ -335,13 +477,32 @@ def possible_results(word, context):
         results = [result for result in results if result.count("y") != 1 or "b" in result]
         _RESULTS[context.word_length] = results
 
-    # Filter out impossible results for this word first
-    for result in _RESULTS[context.word_length]:
-        if is_result_possible(word, result, context):
-            yield result
+    # Which results are possible only depends on where letters repeat
+    # Number each letter by its first index, so "speed" and "sweet" match
+    pattern = tuple([word.index(letter) for letter in word])
+
+    if pattern not in _POSSIBLE_RESULTS:
+        if len(set(word)) == len(word):
+            # Without repeated letters, every result is possible
+            results = _RESULTS[context.word_length]
+        else:
+            # Filter out impossible results for this word first
+            results = [result for result in _RESULTS[context.word_length]
+                if is_result_possible(word, result, context)]
+
+        _POSSIBLE_RESULTS[pattern] = tuple(results)
+
+    return _POSSIBLE_RESULTS[pattern]
+
+# Sort key for each result seen so far
+_RESULT_KEYS = {}
 
 def _result_key(result):
     """Helper function to sort by largest space first"""
+    # There are only so many results, so only calculate each key once
+    if result in _RESULT_KEYS:
+        return _RESULT_KEYS[result]
+
     # b > y = 1 > g = 2
     # lower is larger space
     # (This algorithm was invented by Github Copilot)
@@ -357,106 +518,156 @@ def _result_key(result):
         else:
             sort_order.append(2)
 
-    return space, tuple(sort_order)
+    _RESULT_KEYS[result] = space, tuple(sort_order)
+    return _RESULT_KEYS[result]
+
+def _largest_partition_result(sizes):
+    """Return the result that keeps the most solutions, used as the foil"""
+    # Break ties by the order partition() sorts results in
+    # The guess cache saves foils, so this must stay the same for every heuristic
+    largest = max(sizes.values())
+    return min([result for result, part in sizes.items() if part == largest],
+        key = _result_key)
 
 class SolutionGroup(BaseSolutionGroup):
     """
     Use results learned from playing the game to refine possible solutions.
     """
+    __slots__ = ()
+
+    def _prepare_stats(self):
+        """Calculate statistics, including letter counts to filter solutions"""
+        super()._prepare_stats()
+
+        if self._letter_min_count is not None:
+            # Already calculated
+            return
+
+        self._letter_min_count = _word_list_letter_min_count(
+            self._words, self.context.letters, self.context.word_length)
+
     def filter_solutions(self, word, result):
         """Remove solutions that are not consistent with word and result."""
         # Update statistics, if needed
         self._prepare_stats()
 
-        # Get current word count
-        word_count = len(self)
+        # Gather the results for each letter in word in a single pass
+        letter_results = {}
+        for index in range(self.context.word_length):
+            letter_results.setdefault(word[index], []).append(result[index])
 
+        word_mask = self._mask
         for index in range(self.context.word_length):
             if result[index] == "g":
                 # Keep only words that have that letter in that position
-                self._word_list.intersection_update(self._word_breakdown[index][word[index]])
+                word_mask &= self._word_breakdown[index][word[index]]
             else:
                 # Keep only words that don't have that letter in that position
-                self._word_list.difference_update(self._word_breakdown[index][word[index]])
+                word_mask &= ~self._word_breakdown[index][word[index]]
 
                 if result[index] == "y":
                     # Keep only words that have that letter somewhere
-                    self._word_list.intersection_update(self._word_contains[word[index]])
+                    word_mask &= self._word_contains[word[index]]
                 else:
                     assert result[index] == "b"
 
                     # If letter does not appear anywhere else in the word,
                     # then keep only works without the letter
-                    if not (word[index] in word[:index] or word[index] in word[index + 1:]):
-                        self._word_list.difference_update(self._word_contains[word[index]])
+                    if len(letter_results[word[index]]) == 1:
+                        word_mask &= ~self._word_contains[word[index]]
 
         # Filter further for repeated letters
-        for letter in set(word):
-            if word.count(letter) > 1:
+        for letter, results in letter_results.items():
+            if len(results) > 1:
                 # A letter occurs multiple times. Figure out the relationship it has with the solution
-                absent_count = 0
-                present_count = 0
-                correct_count = 0
-
-                indexes = []
-                for index in range(self.context.word_length):
-                    if word[index] != letter:
-                        continue
-
-                    indexes.append(index)
-                    if result[index] == "g":
-                        correct_count += 1
-                    elif result[index] == "y":
-                        present_count += 1
-                    else:
-                        assert result[index] == "b"
-                        absent_count += 1
+                absent_count = results.count("b")
+                present_count = results.count("y")
+                correct_count = results.count("g")
 
+                min_count = self._letter_min_count[letter]
+                count = present_count + correct_count
                 if absent_count and (present_count or correct_count):
                     # The word occurs more times in this word than the solution
                     # Restrict count
-                    self._word_list.intersection_update(
-                        self._letter_count[letter][present_count + correct_count])
+                    word_mask &= min_count[count] & ~min_count[count + 1]
                 elif absent_count and not present_count and not correct_count:
                     # Letter does not occur in word
-                    self._word_list.difference_update(self._word_contains[letter])
+                    word_mask &= ~self._word_contains[letter]
                 else:
                     assert not absent_count
                     # No strict limit on the number of letters, but we can set a lower limit
-                    for count in range(1, present_count + correct_count):
-                        self._word_list.difference_update(self._letter_count[letter][count])
+                    word_mask &= min_count[count]
 
-        # Mark as change if solutions were eliminated
-        self._changed = word_count != len(self)
+        self._mask = word_mask
 
-    def guess_rank(self, guess):
+    def guess_rank(self, guess, rank_upper_bound = None):
         """
         Calculate rank of a word in this group.
         Uses heuristic of max partition size to rank guesses.
+        If rank_upper_bound is given, stop as soon as the rank is known to be
+        worse than it. Then the rank returned is only a lower bound, and the
+        foil is None.
         """
-        rank = 0
-        foil = None
+        if rank_upper_bound is None:
+            sizes = self.partition_sizes(guess)
+        else:
+            # The bound is max partition size plus a fraction less than 1
+            # Any larger partition always makes a worse rank
+            max_part = int(rank_upper_bound)
+
+            sizes = {}
+            guess_results = _guess_results(guess, self.context)
+            for solution in self:
+                result = guess_results(solution)
+                part = sizes.get(result, 0) + 1
+                if part > max_part:
+                    return part, None
+                sizes[result] = part
 
-        partitions = 0
-        for result, solution_part in self.partition(guess, sort = True):
-            partitions += 1
+        assert sizes, f"No partitions found for {guess}"
 
-            part = len(solution_part)
-            if part > rank:
-                rank = part
-                foil = result
+        rank = max(sizes.values())
 
-        assert rank, f"No partitions found for {guess}"
+        # Foil is the result that keeps the most combinations
+        foil = _largest_partition_result(sizes)
 
         # Use the number of partitions as a tie breaker
         # Since lower rank is better, use 1 / partitions
         # Since 0 < 1 / (partitions + 1) < 1, just add partitions as a decimal
         # (Using p + 1 to avoid the case where partitions is 1)
-        rank +=  1 / (partitions + 1)
+        rank +=  1 / (len(sizes) + 1)
+
+        return rank, foil
+
+    def guess_entropy_rank(self, guess):
+        """
+        Calculate rank of a word in this group.
+        Uses heuristic of the entropy of the partitions, in bits.
+        Rank is negative entropy, so lower rank is still better guess.
+        Foil is the result that keeps the most solutions, same as guess_rank().
+        """
+        sizes = self.partition_sizes(guess)
+        assert sizes, f"No partitions found for {guess}"
+
+        foil = _largest_partition_result(sizes)
+
+        # Entropy is -sum(p * log2(p)) with p = part / total
+        # Which is log2(total) - sum(part * log2(part)) / total
+        # Sum in sorted order, so the same sizes always give the same rank
+        total = sum(sizes.values())
+        rank = sum([part * math.log2(part) for part in sorted(sizes.values())]) / total - \
+            math.log2(total)
 
-        # Foil is the result that keeps the most combinations
         return rank, foil
 
+    def partition_sizes(self, guess):
+        """
+        Count solutions for each possible result of guess.
+        Same as the sizes from partition(), without building any groups.
+        """
+        guess_results = _guess_results(guess, self.context)
+        return Counter([guess_results(solution) for solution in self])
+
     def partition(self, guess, sort = False):
         """
         Generate partitions solutions for each possible result of guess.
@@ -467,25 +678,36 @@ class SolutionGroup(BaseSolutionGroup):
         # Y is present
         # B is absent
         partitions = {}
-        for solution in self:
-            result = wordle_result(guess, solution, self.context)
-            partitions.setdefault(result, set()).add(solution)
+        guess_results = _guess_results(guess, self.context)
+        for word_id in _bit_indexes(self._mask):
+            result = guess_results(self._words[word_id])
+            partitions.setdefault(result, []).append(word_id)
 
         if sort:
             partitions = sortdict(partitions, key = _result_key)
 
-        for result, solution_part in partitions.items():
-            yield result, self.__class__(solution_part, self.context)
+        # Each partition is a copy that keeps only its own words
+        # That way the word numbering and stats are shared, not rebuilt
+        for result, word_ids in partitions.items():
+            solution_part = self.copy()
+            solution_part._mask = _bitmask(word_ids, len(self._words))
+            yield result, solution_part
 
-    def _guess_rank_mp(self, guess_group):
+    def _guess_rank_mp(self, guess_group, best_rank = None, heuristic = "minimax"):
+        """
+        Find the best guesses in guess_group.
+        If best_rank is given, only guesses at least as good are returned.
+        """
         assert guess_group, "No guesses to rank"
 
-        best_rank = None
-        best_guesses = None
-        best_foils = None
+        best_guesses = None if best_rank is None else []
+        best_foils = None if best_rank is None else []
 
         for guess in guess_group:
-            rank, foil = self.guess_rank(guess)
+            if heuristic == "entropy":
+                rank, foil = self.guess_entropy_rank(guess)
+            else:
+                rank, foil = self.guess_rank(guess, best_rank)
 
             if not best_rank or rank < best_rank:
                 best_rank = rank
@@ -515,11 +737,35 @@ def filter_guesses(guess_group, solution_group, progress = True):
         print(f"Filtered {full_word_list_count} words down to "
             f"{len(guess_group)} in {stop - start:.4f} secs")
 
-def best_guesses(guess_group, solution_group, progress = True, mp = True, cache = True):
-    """Generate the best guesses for the words and solutions."""
+# Solution group for each worker process, so it is only sent once
+_worker_solution_group = None
+
+def _init_guess_rank_worker(solution_group):
+    """Save the solution group when a worker process starts."""
+    global _worker_solution_group
+    _worker_solution_group = solution_group
+
+def _guess_rank_worker(guess_group, best_rank, heuristic):
+    """Rank a chunk of guesses against the worker's solution group."""
+    return _worker_solution_group._guess_rank_mp(guess_group, best_rank, heuristic)
+
+def best_guesses(guess_group, solution_group, progress = True, mp = True, cache = True,
+        heuristic = "minimax"):
+    """
+    Generate the best guesses for the words and solutions.
+    heuristic: "minimax" ranks guesses by the largest partition of solutions.
+        "entropy" ranks guesses by the entropy of the partitions.
+    """
     if guess_group.context != solution_group.context:
         raise ValueError("Guess and solution groups must have the same context")
 
+    if heuristic not in ("minimax", "entropy"):
+        raise ValueError(f"Unknown heuristic {heuristic!r}")
+
+    if heuristic != "minimax":
+        # The cache only holds guesses ranked by largest partition
+        cache = False
+
     context = guess_group.context
     if cache:
         # Use context to check if results can be returned from the cache
@@ -531,16 +777,32 @@ def best_guesses(guess_group, solution_group, progress = True, mp = True, cache
         # Multiprocessing is not worth it for small problems
         mp = False
 
+    # With two or less solutions, any solution is a perfect guess, and
+    # ranking stops after the solutions. So skip filtering the guesses, and
+    # rank in this process however many guesses there are
+    # wordle_test.py and cache_fill.py pick a guess themselves at this size,
+    # so this is for other callers, and wordle_main.py with two solutions left
+    few_solutions = len(solution_group) <= 2
+    if few_solutions:
+        mp = False
+
     # Find the best next word
     best_rank = None
     best_guesses = None
     best_foils = None
 
+    # Rank when every solution has its own partition, no guess can do better
+    if heuristic == "entropy":
+        perfect_rank = -math.log2(len(solution_group))
+    else:
+        perfect_rank = 1 + 1 / (len(solution_group) + 1)
+
     # Remove extra guesses
-    filter_guesses(guess_group, solution_group, progress)
+    if not few_solutions:
+        filter_guesses(guess_group, solution_group, progress)
 
     if mp is True:
-        mp = cpu_count()
+        mp = available_cpu_count()
 
     start = time.perf_counter()
     if mp:
@@ -550,7 +812,9 @@ def best_guesses(guess_group, solution_group, progress = True, mp = True, cache
 
         with ProgressBarMP(len(guess_group), persist = progress,
                 enabled = progress is not False) as progress_bar_mp, \
-                concurrent.futures.ProcessPoolExecutor(mp) as executor:
+                concurrent.futures.ProcessPoolExecutor(mp,
+                    initializer = _init_guess_rank_worker,
+                    initargs = (solution_group,)) as executor:
 
             for guess_list in [solution_group, filter_blacklist(guess_group, solution_group)]:
                 if not guess_list:
@@ -560,10 +824,14 @@ def best_guesses(guess_group, solution_group, progress = True, mp = True, cache
                     continue
 
                 # Process for each batch
+                # Use several chunks per process, so a process that finishes
+                # early can pick up another chunk instead of waiting
+                # Pass along the best rank from previous batches, so
+                # workers can skip guesses that are worse
                 fs = []
-                for guess_chunk in chunked(guess_list, mp):
-                    future = executor.submit(solution_group._guess_rank_mp,
-                        progress_bar_mp.worker_loop(guess_chunk))
+                for guess_chunk in chunked(guess_list, mp * 4):
+                    future = executor.submit(_guess_rank_worker,
+                        progress_bar_mp.worker_loop(guess_chunk), best_rank, heuristic)
                     fs.append(future)
 
                 progress_bar_mp.parent_loop(lambda x: wait_exception_or_completed(fs, x))
@@ -580,34 +848,39 @@ def best_guesses(guess_group, solution_group, progress = True, mp = True, cache
                         best_guesses.extend(guesses)
                         best_foils.extend(foils)
 
-                # Sanity check for duplicates
-                assert len(best_guesses) == len(set(best_guesses)), "Duplicate guesses found"
-
-                # No need to continue processing if rank is < 2
-                if best_rank < 2:
+                # No need to continue processing if no guess can do better
+                if best_rank <= perfect_rank:
                     progress_bar_mp.complete()
                     break
 
     else:
         # Use single process
-        nonsolution_start = len(solution_group)
-        for i, guess in enumerate(progress_bar(
-                itertools.chain(solution_group, filter_blacklist(guess_group, solution_group)),
-                len(guess_group), persist = progress, enabled = progress is not False)):
+        # Rank in the same batches as multiprocessing, solutions first
+        guess_iter = progress_bar(
+            itertools.chain(solution_group, filter_blacklist(guess_group, solution_group)),
+            len(guess_group), persist = progress, enabled = progress is not False)
 
-            rank, foil = solution_group.guess_rank(guess)
+        # The last batch uses the rest of guess_iter, so the progress bar finishes
+        for guess_count, guess_batch in [
+                (len(solution_group), itertools.islice(guess_iter, len(solution_group))),
+                (len(guess_group) - len(solution_group), guess_iter)]:
+            if not guess_count:
+                # On the chance all guesses are solutions
+                continue
+
+            rank, guesses, foils = solution_group._guess_rank_mp(guess_batch, best_rank, heuristic)
 
             if not best_rank or rank < best_rank:
                 best_rank = rank
-                best_guesses = [guess]
-                best_foils = [foil]
+                best_guesses = guesses
+                best_foils = foils
 
             elif rank == best_rank:
-                best_guesses.append(guess)
-                best_foils.append(foil)
+                best_guesses.extend(guesses)
+                best_foils.extend(foils)
 
-            # No need to continue processing if rank is < 2
-            if i + 1 == nonsolution_start and best_rank < 2:
+            # No need to continue processing if no guess can do better
+            if best_rank <= perfect_rank:
                 break
 
     # If a guess is in the solution set, that actually makes it
@@ -629,6 +902,9 @@ def best_guesses(guess_group, solution_group, progress = True, mp = True, cache
 
     assert len(best_guesses) == len(best_foils), "Number of guesses and foils do not match"
 
+    # Sanity check for duplicates
+    assert len(best_guesses) == len(set(best_guesses)), "Duplicate guesses found"
+
     if cache:
         # Add results to cache
         context = guess_group.context
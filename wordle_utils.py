@@ -2,6 +2,7 @@
 Utility functions to help with display progress and
 time taken.
 """
+import os
 import sys
 import time
 import itertools
@@ -365,6 +366,17 @@ class ProgressBarMP:
                 raise RuntimeError("Progress bar finished early at "
                                 f"{self.count_value.value} / {self.length}")
 
+def available_cpu_count():
+    """
+    Number of CPUs this process is allowed to run on.
+    Respects CPU affinity where the platform supports it.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on this platform
+        return multiprocessing.cpu_count()
+
 def chunked(iterable, n):
     """
     Separate iterable into n chunks. If the iterable does not divide evenly,